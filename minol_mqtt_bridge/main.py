@@ -1,31 +1,99 @@
 import time
-import json
+import functools
 import os
 import logging
+import socket
 import sys
 import paho.mqtt.client as mqtt
 from minol_connector import MinolConnector
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
 OPTIONS_PATH = '/data/options.json'
+SESSION_PATH = '/data/minol_session.json'
+BROWSER_STATE_PATH = '/data/minol_browser_state.json'
+MQTT_KEEPALIVE = 120
+
+# (data key, display name, unit, icon, device class) per consumption category.
+CATEGORIES = (
+    ("heating", "Heating", "kWh", "mdi:radiator", "energy"),
+    ("hot_water", "Hot Water", "m³", "mdi:water-thermometer", "water"),
+    ("cold_water", "Cold Water", "m³", "mdi:water-pump", "water"),
+)
+
+# Discovery payload with the constant fields pre-serialized; only the
+# per-sensor values are encoded and spliced in on each call.
+_DISCOVERY_TEMPLATE = (
+    b'{"name":%s,"unique_id":%s,"state_topic":%s,"unit_of_measurement":%s,'
+    b'"device_class":%s,"state_class":%s,"icon":%s,"platform":"mqtt","device":'
+    + _dumps({
+        "identifiers": ["minol_account"],
+        "name": "Minol Customer Portal",
+        "manufacturer": "Minol",
+        "model": "Web Scraper"
+    }).replace(b"%", b"%%")
+    + b'%s}'
+)
+
+# Per-room attribute payload in publish order; copied and filled in for each room.
+_ROOM_ATTRS_TEMPLATE = {
+    "room_name": None,
+    "device_number": None,
+    "current_reading": 0,
+    "initial_reading": 0,
+    "consumption": 0,
+    "evaluation_factor": 0,
+    "unit_raw": "",
+    "consumption_evaluated": 0,
+    "monthly_history": None,
+}
 
+# Hash of the last discovery payload published per unique_id.
+_discovery_hash_cache: dict[str, int] = {}
 
+# Hash of the customer attributes published last, None until the first publish.
+_last_customer_hash = None
+
+# Connector shared across cycles, created by get_connector().
+_connector = None
+
+# (payload, retain) queued during a sync cycle, keyed by topic (last write wins).
+_pending: dict[str, tuple[bytes, bool]] = {}
+
+
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from Home Assistant options.json or environment variables."""
+    """
+    Load configuration from Home Assistant options.json or environment variables.
+
+    The result is cached; the options only change when the add-on restarts.
+    """
     if os.path.exists(OPTIONS_PATH):
-        with open(OPTIONS_PATH, 'r') as f:
-            return json.load(f)
-    else:
-        return {
-            "minol_email": os.environ.get("MINOL_EMAIL"),
-            "minol_password": os.environ.get("MINOL_PASSWORD"),
-            "mqtt_host": os.environ.get("MQTT_HOST", "localhost"),
-            "mqtt_port": int(os.environ.get("MQTT_PORT", 1883)),
-            "mqtt_user": os.environ.get("MQTT_USER"),
-            "mqtt_password": os.environ.get("MQTT_PASSWORD"),
-            "scan_interval_hours": 6,
-            "base_url": os.environ.get("BASE_URL"),
-            "log_level": os.environ.get("LOG_LEVEL", "INFO")
-        }
+        with open(OPTIONS_PATH, 'rb') as f:
+            return _loads(f.read())
+
+    return {
+        "minol_email": os.environ.get("MINOL_EMAIL"),
+        "minol_password": os.environ.get("MINOL_PASSWORD"),
+        "mqtt_host": os.environ.get("MQTT_HOST", "localhost"),
+        "mqtt_port": int(os.environ.get("MQTT_PORT", 1883)),
+        "mqtt_user": os.environ.get("MQTT_USER"),
+        "mqtt_password": os.environ.get("MQTT_PASSWORD"),
+        "scan_interval_hours": 6,
+        "base_url": os.environ.get("BASE_URL"),
+        "log_level": os.environ.get("LOG_LEVEL", "INFO")
+    }
 
 
 config = load_config()
@@ -39,7 +107,7 @@ logging.basicConfig(
     force=True
 )
 logger = logging.getLogger("MinolBridge")
-logger.info(f"Log level set to: {log_level_str}")
+logger.info("Log level set to: %s", log_level_str)
 
 mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
 
@@ -47,14 +115,31 @@ if config.get("mqtt_user") and config.get("mqtt_password"):
     mqtt_client.username_pw_set(config["mqtt_user"], config["mqtt_password"])
 
 
+def on_connect(client, userdata, flags, reason_code, properties):
+    """Tune the new socket and forget what was published before a (re)connect."""
+    global _last_customer_hash
+
+    sock = client.socket()
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except (AttributeError, OSError) as e:
+        logger.debug("Could not disable Nagle on MQTT socket: %s", e)
+
+    _discovery_hash_cache.clear()
+    _last_customer_hash = None
+
+
+mqtt_client.on_connect = on_connect
+
+
 def connect_mqtt():
     """Connect to the MQTT broker."""
     try:
-        mqtt_client.connect(config["mqtt_host"], config["mqtt_port"], 60)
+        mqtt_client.connect(config["mqtt_host"], config["mqtt_port"], MQTT_KEEPALIVE)
         mqtt_client.loop_start()
         logger.info("Connected to MQTT Broker")
     except Exception as e:
-        logger.error(f"Failed to connect to MQTT: {e}")
+        logger.error("Failed to connect to MQTT: %s", e)
         sys.exit(1)
 
 
@@ -62,39 +147,155 @@ def publish_discovery_config(sensor_type, unique_id, name, unit, icon, device_cl
     """Publish Home Assistant MQTT discovery configuration for automatic sensor creation."""
     topic = f"homeassistant/sensor/minol/{unique_id}/config"
 
-    payload = {
-        "name": name,
-        "unique_id": f"minol_{unique_id}",
-        "state_topic": f"minol/{unique_id}/state",
-        "unit_of_measurement": unit,
-        "device_class": device_class,
-        "state_class": state_class,
-        "icon": icon,
-        "platform": "mqtt",
-        "device": {
-            "identifiers": ["minol_account"],
-            "name": "Minol Customer Portal",
-            "manufacturer": "Minol",
-            "model": "Web Scraper"
-        }
-    }
+    extra = b',"json_attributes_topic":%s' % _dumps(attributes_topic) if attributes_topic else b""
+    data = _DISCOVERY_TEMPLATE % (
+        _dumps(name),
+        _dumps(f"minol_{unique_id}"),
+        _dumps(f"minol/{unique_id}/state"),
+        _dumps(unit),
+        _dumps(device_class),
+        _dumps(state_class),
+        _dumps(icon),
+        extra,
+    )
+
+    payload_hash = hash(data)
+    if _discovery_hash_cache.get(unique_id) == payload_hash:
+        return
 
-    if attributes_topic:
-        payload["json_attributes_topic"] = attributes_topic
+    _pending[topic] = (data, True)
+    _discovery_hash_cache[unique_id] = payload_hash
 
-    mqtt_client.publish(topic, json.dumps(payload), qos=0, retain=True)
 
+@functools.lru_cache(maxsize=None)
+def _state_topic(unique_id):
+    """Return the state topic for a sensor."""
+    return f"minol/{unique_id}/state"
 
-def publish_state(unique_id, value):
-    """Publish sensor state value to MQTT."""
-    topic = f"minol/{unique_id}/state"
-    mqtt_client.publish(topic, str(value), qos=0, retain=True)
 
+def publish_state(unique_id, value, retain=True):
+    """Queue sensor state value for publishing to MQTT."""
+    if isinstance(value, bytes):
+        payload = value
+    elif isinstance(value, str):
+        payload = value.encode("utf-8")
+    else:
+        # str() keeps full float precision, matching what was published before.
+        payload = str(value).encode("utf-8")
+    _pending[_state_topic(unique_id)] = (payload, retain)
 
-def publish_attributes(unique_id, attributes):
-    """Publish sensor JSON attributes to MQTT."""
+
+def publish_attributes(unique_id, attributes, retain=True):
+    """
+    Queue sensor JSON attributes for publishing to MQTT.
+
+    Attributes are retained so Home Assistant gets them back after a restart;
+    each topic is only written once per cycle.
+    """
     topic = f"minol/{unique_id}/attributes"
-    mqtt_client.publish(topic, json.dumps(attributes), qos=0, retain=True)
+    _pending[topic] = (_dumps(attributes), retain)
+
+
+def flush_publishes(timeout=30):
+    """
+    Publish all queued payloads to MQTT in one pass.
+
+    The messages are handed to paho's network thread, which writes them to the
+    socket while the loop keeps queueing; only the last one is waited for.
+    """
+    publish = mqtt_client.publish
+    info = None
+    for topic, (payload, retain) in _pending.items():
+        info = publish(topic, payload, qos=0, retain=retain)
+    count = len(_pending)
+    _pending.clear()
+
+    if info is None:
+        return
+    if info.rc != mqtt.MQTT_ERR_SUCCESS:
+        logger.warning("Failed to queue MQTT messages: %s", mqtt.error_string(info.rc))
+        return
+
+    try:
+        # Raises if the connection drops while the batch is still being written.
+        info.wait_for_publish(timeout)
+        published = info.is_published()
+    except (RuntimeError, ValueError) as e:
+        logger.warning("Failed to flush %s MQTT messages: %s", count, e)
+        return
+
+    if published:
+        logger.debug("Flushed %s MQTT messages", count)
+    else:
+        logger.warning("Timed out flushing %s MQTT messages", count)
+
+
+@functools.lru_cache(maxsize=None)
+def _slug(text):
+    """Strip non-alphanumeric characters from a name for use in unique IDs."""
+    return "".join(c for c in text if c.isalnum())
+
+
+def get_connector():
+    """Return the connector shared across cycles, restoring a saved session on first use."""
+    global _connector
+
+    if _connector is None:
+        _connector = MinolConnector(
+            config["minol_email"],
+            config["minol_password"],
+            config["base_url"],
+            state_path=BROWSER_STATE_PATH
+        )
+        _connector.restore_session(SESSION_PATH)
+    return _connector
+
+
+def _project_timeline(timeline):
+    """
+    Project timeline entries to the attribute shapes published per category.
+
+    Returns the monthly_data list for the total sensor and the overall_timeline
+    list shared by all room sensors, both built in a single pass.
+    """
+    monthly_data = []
+    overall_timeline = []
+    add_monthly = monthly_data.append
+    add_overall = overall_timeline.append
+    for entry in timeline:
+        get = entry.get
+        period = get("period")
+        value = get("value", 0)
+        add_monthly({"period": period, "value": value, "label": get("label", "")})
+        add_overall({"period": period, "value": value})
+    return monthly_data, overall_timeline
+
+
+def calculate_din_comparison(timeline):
+    """Calculate percentage above/below DIN average."""
+    if not timeline:
+        return None
+
+    total_actual = total_ref = 0.0
+    for entry in timeline:
+        if not entry:
+            continue
+        value = entry.get("value") or 0
+        try:
+            value = float(value)
+        except (TypeError, ValueError) as e:
+            logger.warning("Error calculating DIN comparison: %s", e)
+            continue
+        if entry.get("label") == "REF":
+            total_ref += value
+        else:
+            total_actual += value
+
+    if total_ref > 0:
+        diff_percent = ((total_actual - total_ref) / total_ref) * 100
+        return round(diff_percent, 1)
+
+    return None
 
 
 def run_sync():
@@ -104,12 +305,18 @@ def run_sync():
     Publishes total consumption sensors, per-room/device sensors,
     DIN comparison sensors, and customer info.
     """
-    connector = MinolConnector(config["minol_email"], config["minol_password"], config["base_url"])
+    global _last_customer_hash
 
-    logger.info("Starting authentication...")
-    if not connector.authenticate():
-        logger.error("Authentication failed. Retrying next cycle.")
-        return
+    connector = get_connector()
+
+    if connector.validate_session():
+        logger.info("Reusing existing Minol session")
+    else:
+        logger.info("Starting authentication...")
+        if not connector.authenticate():
+            logger.error("Authentication failed. Retrying next cycle.")
+            return
+        connector.save_session(SESSION_PATH)
 
     logger.info("Fetching consumption data...")
     data = connector.get_consumption_data(months_back=12, force_update=True)
@@ -142,151 +349,69 @@ def run_sync():
             "move_in_date": user_info.get("einzugMieter", ""),
         }
 
-        publish_discovery_config(
-            "info",
-            "customer_info",
-            "Minol Customer Info",
-            "",
-            "mdi:account",
-            None,
-            state_class=None,
-            attributes_topic="minol/customer_info/attributes"
-        )
-        publish_state("customer_info", customer_attrs.get("customer_number", "N/A"))
-        publish_attributes("customer_info", customer_attrs)
-
-    def calculate_din_comparison(timeline):
-        """Calculate percentage above/below DIN average."""
-        if not timeline:
-            return None
-
-        try:
-            total_actual = sum(
-                float(entry.get("value", 0) or 0)
-                for entry in timeline
-                if entry and entry.get("label") != "REF"
-            )
-            total_ref = sum(
-                float(entry.get("value", 0) or 0)
-                for entry in timeline
-                if entry and entry.get("label") == "REF"
+        customer_hash = hash(tuple(sorted(customer_attrs.items())))
+        if customer_hash == _last_customer_hash:
+            logger.debug("Customer data unchanged since last cycle, skipping publish")
+        else:
+            publish_discovery_config(
+                "info",
+                "customer_info",
+                "Minol Customer Info",
+                "",
+                "mdi:account",
+                None,
+                state_class=None,
+                attributes_topic="minol/customer_info/attributes"
             )
+            publish_state("customer_info", customer_attrs.get("customer_number", "N/A"))
+            publish_attributes("customer_info", customer_attrs)
+            _last_customer_hash = customer_hash
 
-            if total_ref > 0:
-                diff_percent = ((total_actual - total_ref) / total_ref) * 100
-                return round(diff_percent, 1)
-        except (TypeError, ValueError) as e:
-            logger.warning(f"Error calculating DIN comparison: {e}")
-
-        return None
+    def publish_total(cat, category_key, category_name, unit, icon, device_class, monthly_data, din_comparison):
+        """Publish total consumption sensor with monthly timeline attributes."""
+        if "total_consumption" not in cat:
+            return
 
-    if "heating" in data and "total_consumption" in data["heating"]:
-        val = data["heating"]["total_consumption"]
-        timeline = data["heating"].get("timeline", [])
-        din_comparison = calculate_din_comparison(timeline)
+        val = cat["total_consumption"]
 
         # Build timeline attributes
         timeline_attrs = {
-            "monthly_data": [
-                {
-                    "period": entry.get("period"),
-                    "value": entry.get("value", 0),
-                    "label": entry.get("label", "")
-                }
-                for entry in timeline
-            ],
-            "din_comparison_percent": din_comparison,
-            "last_update": data.get("timestamp", ""),
-        }
-
-        publish_discovery_config(
-            "heating",
-            "heating_total",
-            "Minol Heating Total",
-            "kWh",
-            "mdi:radiator",
-            "energy",
-            state_class="total_increasing",
-            attributes_topic="minol/heating_total/attributes"
-        )
-        publish_state("heating_total", val)
-        publish_attributes("heating_total", timeline_attrs)
-
-    if "hot_water" in data and "total_consumption" in data["hot_water"]:
-        val = data["hot_water"]["total_consumption"]
-        timeline = data["hot_water"].get("timeline", [])
-        din_comparison = calculate_din_comparison(timeline)
-
-        timeline_attrs = {
-            "monthly_data": [
-                {
-                    "period": entry.get("period"),
-                    "value": entry.get("value", 0),
-                    "label": entry.get("label", "")
-                }
-                for entry in timeline
-            ],
-            "din_comparison_percent": din_comparison,
-            "last_update": data.get("timestamp", ""),
-        }
-
-        publish_discovery_config(
-            "water",
-            "hot_water_total",
-            "Minol Hot Water Total",
-            "m³",
-            "mdi:water-thermometer",
-            "water",
-            state_class="total_increasing",
-            attributes_topic="minol/hot_water_total/attributes"
-        )
-        publish_state("hot_water_total", val)
-        publish_attributes("hot_water_total", timeline_attrs)
-
-    if "cold_water" in data and "total_consumption" in data["cold_water"]:
-        val = data["cold_water"]["total_consumption"]
-        timeline = data["cold_water"].get("timeline", [])
-        din_comparison = calculate_din_comparison(timeline)
-
-        timeline_attrs = {
-            "monthly_data": [
-                {
-                    "period": entry.get("period"),
-                    "value": entry.get("value", 0),
-                    "label": entry.get("label", "")
-                }
-                for entry in timeline
-            ],
+            "monthly_data": monthly_data,
             "din_comparison_percent": din_comparison,
             "last_update": data.get("timestamp", ""),
         }
 
+        uid = f"{category_key}_total"
         publish_discovery_config(
-            "water",
-            "cold_water_total",
-            "Minol Cold Water Total",
-            "m³",
-            "mdi:water-pump",
-            "water",
+            category_key,
+            uid,
+            f"Minol {category_name} Total",
+            unit,
+            icon,
+            device_class,
             state_class="total_increasing",
-            attributes_topic="minol/cold_water_total/attributes"
+            attributes_topic=f"minol/{uid}/attributes"
         )
-        publish_state("cold_water_total", val)
-        publish_attributes("cold_water_total", timeline_attrs)
+        publish_state(uid, val)
+        publish_attributes(uid, timeline_attrs)
 
-    def process_rooms_extended(category_key, category_name, unit, icon, device_class):
+    def process_rooms_extended(cat, category_key, category_name, unit, icon, device_class, overall_monthly):
         """Process room data and publish sensors with extended attributes and monthly history."""
-        if category_key not in data or "by_room" not in data[category_key]:
+        if "by_room" not in cat:
             return
 
-        overall_timeline = data[category_key].get("timeline", [])
+        # Identical for every room of the category, so all rooms share one dict.
+        monthly_history = {
+            "overall_timeline": overall_monthly,
+            "note": "Per-room timeline not available from API. Showing overall consumption timeline.",
+        }
 
-        for room in data[category_key]["by_room"]:
+        for room in cat["by_room"]:
             r_name = room.get("room_name", "Unknown")
             device_num = room.get("device_number", "")
 
-            safe_room = "".join(c for c in r_name if c.isalnum()).lower()
-            safe_device = "".join(c for c in str(device_num) if c.isalnum())
+            safe_room = _slug(r_name).lower()
+            safe_device = _slug(str(device_num))
             uid = f"{category_key}_{safe_room}_{safe_device}" if safe_device else f"{category_key}_{safe_room}"
 
             val = room.get("consumption", 0)
@@ -294,27 +419,16 @@ def run_sync():
             device_suffix = f" ({device_num})" if device_num else ""
             sensor_name = f"Minol {r_name} {category_name}{device_suffix}"
 
-            extended_attrs = {
-                "room_name": r_name,
-                "device_number": device_num,
-                "current_reading": room.get("reading", 0),
-                "initial_reading": room.get("initial_reading", 0),
-                "consumption": val,
-                "evaluation_factor": room.get("evaluation_score", 0),
-                "unit_raw": room.get("unit", ""),
-                "consumption_evaluated": room.get("consumption_evaluated", 0),
-            }
-
-            extended_attrs["monthly_history"] = {
-                "overall_timeline": [
-                    {
-                        "period": entry.get("period"),
-                        "value": entry.get("value", 0),
-                    }
-                    for entry in overall_timeline
-                ],
-                "note": "Per-room timeline not available from API. Showing overall consumption timeline.",
-            }
+            extended_attrs = _ROOM_ATTRS_TEMPLATE.copy()
+            extended_attrs["room_name"] = r_name
+            extended_attrs["device_number"] = device_num
+            extended_attrs["current_reading"] = room.get("reading", 0)
+            extended_attrs["initial_reading"] = room.get("initial_reading", 0)
+            extended_attrs["consumption"] = val
+            extended_attrs["evaluation_factor"] = room.get("evaluation_score", 0)
+            extended_attrs["unit_raw"] = room.get("unit", "")
+            extended_attrs["consumption_evaluated"] = room.get("consumption_evaluated", 0)
+            extended_attrs["monthly_history"] = monthly_history
 
             publish_discovery_config(
                 category_key,
@@ -329,18 +443,8 @@ def run_sync():
             publish_state(uid, val)
             publish_attributes(uid, extended_attrs)
 
-    process_rooms_extended("heating", "Heating", "kWh", "mdi:radiator", "energy")
-    process_rooms_extended("hot_water", "Hot Water", "m³", "mdi:water-thermometer", "water")
-    process_rooms_extended("cold_water", "Cold Water", "m³", "mdi:water-pump", "water")
-
-    def publish_din_comparison(category_key, category_name, unit):
+    def publish_din_comparison(category_key, category_name, din_comparison):
         """Publish dedicated DIN comparison sensor."""
-        if category_key not in data or "timeline" not in data[category_key]:
-            return
-
-        timeline = data[category_key]["timeline"]
-        din_comparison = calculate_din_comparison(timeline)
-
         if din_comparison is not None:
             uid = f"{category_key}_din_comparison"
             sensor_name = f"Minol {category_name} DIN Comparison"
@@ -364,10 +468,20 @@ def run_sync():
             }
             publish_attributes(uid, attrs)
 
-    publish_din_comparison("heating", "Heating", "kWh")
-    publish_din_comparison("hot_water", "Hot Water", "m³")
-    publish_din_comparison("cold_water", "Cold Water", "m³")
+    for category_key, category_name, unit, icon, device_class in CATEGORIES:
+        cat = data.get(category_key)
+        if not cat:
+            continue
+
+        timeline = cat.get("timeline", [])
+        monthly_data, overall_monthly = _project_timeline(timeline)
+        din_comparison = calculate_din_comparison(timeline)
+
+        publish_total(cat, category_key, category_name, unit, icon, device_class, monthly_data, din_comparison)
+        process_rooms_extended(cat, category_key, category_name, unit, icon, device_class, overall_monthly)
+        publish_din_comparison(category_key, category_name, din_comparison)
 
+    flush_publishes()
     logger.info("Data published to MQTT successfully with all enhancements!")
 
 
@@ -378,8 +492,9 @@ if __name__ == "__main__":
         try:
             run_sync()
         except Exception as e:
-            logger.error(f"Critical error in main loop: {e}")
+            logger.error("Critical error in main loop: %s", e)
+            flush_publishes()
 
         interval = config.get("scan_interval_hours", 12)
-        logger.info(f"Sleeping for {interval} hours...")
+        logger.info("Sleeping for %s hours...", interval)
         time.sleep(interval * 3600)
\ No newline at end of file
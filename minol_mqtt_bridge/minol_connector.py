@@ -6,75 +6,336 @@ using Playwright for Azure B2C SAML authentication and requests for API calls.
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import atexit
+import contextlib
 import logging
-import base64
-from urllib.parse import urlparse, parse_qs
-from playwright.sync_api import sync_playwright
+import os
+import threading
 import time
+from urllib.parse import urlparse
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
 }
 
+# Browser-style navigation headers for the monitoring index page (Referer is added per instance).
+INDEX_PAGE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+    'Accept-Language': 'de-DE,de;q=0.9,en-DE;q=0.8,en;q=0.7,en-US;q=0.6',
+    'DNT': '1',
+    'sec-ch-ua': '"Chromium";v="142", "Google Chrome";v="142", "Not_A Brand";v="99"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+    'sec-fetch-dest': 'document',
+    'sec-fetch-mode': 'navigate',
+    'sec-fetch-site': 'same-origin',
+    'sec-fetch-user': '?1',
+    'upgrade-insecure-requests': '1',
+}
+
+# (data key, consType, dlgKey) for each consumption type fetched from readData.
+CONSUMPTION_TYPES = (
+    ("heating", "HEIZUNG", "100EH"),
+    ("hot_water", "WARMWASSER", "100WW"),
+    ("cold_water", "KALTWASSER", "100KW"),
+)
+
+# Playwright driver and Chromium instance shared by logins, started on first use. The
+# sync API is bound to the thread that started the driver, so the pool belongs to
+# that thread; logins on any other thread launch a browser of their own.
+_BROWSER_POOL = {"pw": None, "browser": None, "owner": None}
+_BROWSER_POOL_LOCK = threading.Lock()
+
+CHROMIUM_ARGS = ["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
+
+
+def _launch_browser(pw):
+    """Launch headless Chromium on the given Playwright driver."""
+    logger.info("Launching Chromium...")
+    return pw.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+
+
+def _owns_browser_pool() -> bool:
+    """Claim the browser pool for the calling thread if it is free; return whether it owns it."""
+    current = threading.current_thread()
+    with _BROWSER_POOL_LOCK:
+        owner = _BROWSER_POOL["owner"]
+        if owner is None or not owner.is_alive():
+            if owner is not None:
+                # The pooled objects are bound to the dead thread and cannot be used or closed here.
+                logger.debug("Browser pool owner thread %s has exited, starting over", owner.name)
+                _BROWSER_POOL["pw"] = _BROWSER_POOL["browser"] = None
+            _BROWSER_POOL["owner"] = current
+        return _BROWSER_POOL["owner"] is current
+
+
+def _get_browser():
+    """Return the pooled Chromium browser, (re)launching it if needed. Owner thread only."""
+    browser = _BROWSER_POOL["browser"]
+    if browser is None or not browser.is_connected():
+        if _BROWSER_POOL["pw"] is None:
+            # Imported lazily: Playwright is only needed when a browser login actually runs.
+            from playwright.sync_api import sync_playwright
+
+            _BROWSER_POOL["pw"] = sync_playwright().start()
+        browser = _BROWSER_POOL["browser"] = _launch_browser(_BROWSER_POOL["pw"])
+    return browser
+
+
+def _close_browser_pool():
+    """Close the pooled browser and stop its driver, if the calling thread owns them."""
+    with _BROWSER_POOL_LOCK:
+        if _BROWSER_POOL["owner"] not in (None, threading.current_thread()):
+            return
+        browser, pw = _BROWSER_POOL["browser"], _BROWSER_POOL["pw"]
+        _BROWSER_POOL["browser"] = _BROWSER_POOL["pw"] = _BROWSER_POOL["owner"] = None
+
+    try:
+        if browser is not None:
+            browser.close()
+    except Exception as e:
+        logger.debug("Error closing browser: %s", e)
+    try:
+        if pw is not None:
+            pw.stop()
+    except Exception as e:
+        logger.debug("Error stopping Playwright: %s", e)
+
+
+@contextlib.contextmanager
+def _browser_context(storage_state: Optional[str] = None):
+    """Yield a fresh browser context, so no cookies leak between logins, and close it on exit."""
+    if _owns_browser_pool():
+        try:
+            context = _get_browser().new_context(storage_state=storage_state)
+        except Exception:
+            # Drop the driver too, so a dead one does not break every later login.
+            _close_browser_pool()
+            raise
+        try:
+            yield context
+        finally:
+            context.close()
+        return
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as pw:
+        browser = _launch_browser(pw)
+        try:
+            yield browser.new_context(storage_state=storage_state)
+        finally:
+            browser.close()
+
+
+atexit.register(_close_browser_pool)
+
 
 class MinolConnector:
     """Minol customer portal API client with Playwright-based authentication."""
 
-    def __init__(self, email: str, password: str, base_url: str = "https://webservices.minol.com"):
-        """Initialize the connector with user credentials."""
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        base_url: str = "https://webservices.minol.com",
+        state_path: Optional[str] = None
+    ):
+        """
+        Initialize the connector with user credentials.
+
+        Args:
+            email: Minol portal login
+            password: Minol portal password
+            base_url: Portal base URL
+            state_path: Where to keep the browser storage state between logins
+                (default: ~/.cache/minol/state.json)
+        """
         self.email = email
         self.password = password
+        self._state_path = state_path or os.path.expanduser("~/.cache/minol/state.json")
+        # SAP logon tickets (MYSAPSSO2) are valid for 8 hours by default; saved
+        # sessions and browser state older than that are not worth reusing.
+        self._ticket_lifetime = timedelta(hours=8)
 
         self.base_url = base_url
         self.login_url = f"{base_url}/"
         self.acs_url = f"{base_url}/saml2/sp/acs"
+        self.monitoring_url = f"{base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true"
+
+        # Request headers are the same for every call, so build them once.
+        self._index_headers = {**INDEX_PAGE_HEADERS, 'Referer': f'{self.monitoring_url}/'}
+        self._json_headers = {
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Content-Type': 'application/json; charset=UTF-8',
+            'Referer': self.monitoring_url,
+            'X-Requested-With': 'XMLHttpRequest',
+        }
 
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
-        })
+        self.session = self._new_session()
 
         self.user_tenants = None
         self.user_num = None
         self.csrf_token = None
         self._authenticated = False
+        # Set by login() when the saved browser state let it skip the B2C form.
+        self._reused_state = False
         self._last_data: Optional[Dict] = None
         self._last_update: Optional[datetime] = None
         self._cache_duration = timedelta(hours=1)
+        self._in_flight: Optional[Future] = None
+        self._in_flight_lock = threading.Lock()
+
+    @staticmethod
+    def _new_session() -> requests.Session:
+        """Create the HTTP session used for all portal API calls."""
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        # Keep pooled connections alive for the parallel fetches and retry transient gateway errors.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def reset_session(self):
+        """Replace the HTTP session to drop broken pooled connections, keeping its cookies."""
+        cookies = self.session.cookies
+        self.session.close()
+        self.session = self._new_session()
+        self.session.cookies = cookies
+
+    def _fresh_storage_state(self) -> Optional[str]:
+        """Return the saved browser storage state path if it is recent enough to reuse."""
+        try:
+            age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(self._state_path))
+        except OSError:
+            return None
+        if age > self._ticket_lifetime:
+            logger.info("Saved browser state is too old (%s), logging in from scratch", age)
+            return None
+        return self._state_path
+
+    def _discard_storage_state(self):
+        """Delete the saved browser storage state so the next login starts from scratch."""
+        try:
+            os.remove(self._state_path)
+        except OSError:
+            pass
+
+    def _save_storage_state(self, context):
+        """Save the browser context's cookies and local storage for the next login."""
+        try:
+            os.makedirs(os.path.dirname(self._state_path) or ".", exist_ok=True)
+            context.storage_state(path=self._state_path)
+            os.chmod(self._state_path, 0o600)
+        except Exception as e:
+            logger.warning("Could not save browser state to %s: %s", self._state_path, e)
+
+    @classmethod
+    def shutdown(cls):
+        """Close the shared browser (from the thread that started it); the next login relaunches it."""
+        _close_browser_pool()
+
+    @staticmethod
+    def _visible_locator(page, selector: str, fallback: str, timeout: Optional[float] = None):
+        """
+        Return a locator for the B2C form element matching selector once it is visible.
+
+        The portal's stable IDs are tried first; if the ID does not show up
+        within a second, the ID and the broader fallback selectors are awaited
+        together, so a form that is merely slow to render still matches by ID.
+        """
+        locator = page.locator(selector)
+        try:
+            locator.wait_for(state="visible", timeout=1000)
+            return locator
+        except Exception:
+            logger.debug("Selector %s not visible, trying %s", selector, fallback)
+
+        locator = page.locator(f"{selector}, {fallback}").first
+        locator.wait_for(state="visible", timeout=timeout)
+        return locator
+
+    @staticmethod
+    def _wait_for_sso_cookie(context, page, timeout: float = 5.0) -> bool:
+        """
+        Wait until the MYSAPSSO2 cookie shows up in the browser context.
+
+        The cookie may be HttpOnly, so it cannot be awaited via document.cookie;
+        poll the context instead and return as soon as it appears.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if any(c['name'] == 'MYSAPSSO2' for c in context.cookies()):
+                return True
+            page.wait_for_timeout(200)
+        return False
+
+    @staticmethod
+    def _sso_ticket(cookies) -> Optional[str]:
+        """Return the MYSAPSSO2 logon ticket from a list of browser cookies, if any."""
+        for cookie in cookies:
+            if cookie['name'] == 'MYSAPSSO2':
+                return cookie['value']
+        return None
 
     def login(self):
         """Perform Azure B2C SAML authentication using Playwright."""
         logger.info("Starting Playwright authentication...")
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
-            )
-            context = browser.new_context()
+        storage_state = self._fresh_storage_state()
+        if storage_state:
+            logger.info("Reusing saved browser state")
+        self._reused_state = False
+        with _browser_context(storage_state) as context:
+            # The state file's age tracks the ticket's, so it is only rewritten for a new ticket.
+            saved_ticket = self._sso_ticket(context.cookies()) if storage_state else None
             page = context.new_page()
+            page.set_default_timeout(5000)
+            page.set_default_navigation_timeout(30000)
 
             try:
                 logger.info("Navigating to monitoring page...")
-                monitoring_url = f"{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true&redirect2=true"
+                monitoring_url = f"{self.monitoring_url}&redirect2=true"
                 page.goto(monitoring_url, wait_until="domcontentloaded")
 
-                time.sleep(3)
+                try:
+                    page.wait_for_load_state("networkidle", timeout=5000)
+                except Exception:
+                    logger.debug("Page did not reach network idle, continuing")
                 logger.info(f"Current URL: {page.url}")
 
                 if "minolauth.b2clogin.com" in page.url:
                     logger.info("On Azure B2C login page")
+                elif storage_state:
+                    logger.info("Saved browser state is still valid, skipping login form")
+                    self._reused_state = True
                 else:
                     logger.info("Checking for login redirect...")
-                    page_content = page.content()
-                    with open("current_page.html", "w", encoding="utf-8") as f:
-                        f.write(page_content)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        with open("current_page.html", "w", encoding="utf-8") as f:
+                            f.write(page.content())
 
                     try:
                         page.wait_for_url("**/minolauth.b2clogin.com/**", timeout=5000)
@@ -83,54 +344,63 @@ class MinolConnector:
 
                 if "minolauth.b2clogin.com" in page.url:
                     logger.info("Filling login form...")
-                    time.sleep(2)
-
-                    email_input = page.locator('input[id="signInName"], input[name="signInName"], input[type="email"], input[placeholder*="Kundennummer"]')
-                    email_input.wait_for(state="visible", timeout=10000)
-                    email_input.fill(self.email)
 
-                    password_input = page.locator('input[id="password"], input[name="password"], input[type="password"]')
-                    password_input.wait_for(state="visible", timeout=5000)
-                    password_input.fill(self.password)
-
-                    sign_in_button = page.locator('button[type="submit"], button#next')
-                    sign_in_button.click()
+                    self._visible_locator(
+                        page,
+                        "#signInName",
+                        'input[name="signInName"], input[type="email"], input[placeholder*="Kundennummer"]',
+                        timeout=10000
+                    ).fill(self.email)
+                    self._visible_locator(
+                        page, "#password", 'input[name="password"], input[type="password"]'
+                    ).fill(self.password)
+                    self._visible_locator(page, "#next", 'button[type="submit"]').click()
 
                     logger.info("Waiting for redirect...")
                     page.wait_for_url(f"{self.base_url}/**", timeout=30000)
-                    time.sleep(2)
 
                     logger.info("Navigating to monitoring page...")
                     page.goto(monitoring_url, wait_until="networkidle")
-                    time.sleep(3)
+                    self._wait_for_sso_cookie(context, page)
                 else:
                     logger.info("Checking authentication status...")
 
                 logger.info("Extracting cookies...")
                 cookies = context.cookies()
 
+                # Only cookies the API host will ever send back are worth carrying over.
+                host = urlparse(self.base_url).hostname or ""
+                transferred = 0
                 for cookie in cookies:
+                    domain = cookie.get('domain', '')
+                    bare_domain = domain.lstrip('.')
+                    if bare_domain and host != bare_domain and not host.endswith(f".{bare_domain}"):
+                        continue
                     self.session.cookies.set(
                         name=cookie['name'],
                         value=cookie['value'],
-                        domain=cookie.get('domain', ''),
+                        domain=domain,
                         path=cookie.get('path', '/'),
                         secure=cookie.get('secure', False)
                     )
+                    transferred += 1
 
-                logger.info(f"Transferred {len(cookies)} cookies")
+                logger.info(f"Transferred {transferred} of {len(cookies)} cookies")
 
-                mysapsso2_present = any(c['name'] == 'MYSAPSSO2' for c in cookies)
-                if mysapsso2_present:
+                ticket = self._sso_ticket(cookies)
+                if ticket:
                     logger.info("MYSAPSSO2 cookie obtained")
+                    if ticket != saved_ticket:
+                        self._save_storage_state(context)
                 else:
                     logger.warning("MYSAPSSO2 cookie not found")
+                    if storage_state:
+                        # Don't reuse a state that did not yield a session on the next login.
+                        self._discard_storage_state()
 
             except Exception as e:
                 logger.error(f"Error during Playwright login: {e}")
                 raise
-            finally:
-                browser.close()
 
         logger.info("Login successful.")
         self._authenticated = True
@@ -139,26 +409,13 @@ class MinolConnector:
     def _get_monitoring_index(self):
         """Access the monitoring index page."""
         logger.info("Getting monitoring index page...")
-        url = f"{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true"
-        headers = {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'de-DE,de;q=0.9,en-DE;q=0.8,en;q=0.7,en-US;q=0.6',
-            'DNT': '1',
-            'Referer': f'{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true/',
-            'sec-ch-ua': '"Chromium";v="142", "Google Chrome";v="142", "Not_A Brand";v="99"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"Windows"',
-            'sec-fetch-dest': 'document',
-            'sec-fetch-mode': 'navigate',
-            'sec-fetch-site': 'same-origin',
-            'sec-fetch-user': '?1',
-            'upgrade-insecure-requests': '1',
-        }
+        url = self.monitoring_url
         try:
-            response = self.session.get(url, headers=headers, allow_redirects=True)
+            response = self.session.get(url, headers=self._index_headers, allow_redirects=True)
             response.raise_for_status()
-            with open("monitoring_index_page.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
+            if logger.isEnabledFor(logging.DEBUG):
+                with open("monitoring_index_page.html", "w", encoding="utf-8") as f:
+                    f.write(response.text)
             logger.info(f"Monitoring index page response status code: {response.status_code}")
             logger.info(f"Monitoring index page response cookies: {response.cookies}")
         except requests.exceptions.RequestException as e:
@@ -172,8 +429,9 @@ class MinolConnector:
         try:
             response = self.session.get(url, allow_redirects=True)
             response.raise_for_status()
-            with open("monitoring_page_response.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
+            if logger.isEnabledFor(logging.DEBUG):
+                with open("monitoring_page_response.html", "w", encoding="utf-8") as f:
+                    f.write(response.text)
             logger.info(f"Monitoring client response status code: {response.status_code}")
             logger.info(f"Monitoring client response cookies: {response.cookies}")
         except requests.exceptions.RequestException as e:
@@ -184,40 +442,33 @@ class MinolConnector:
         """Fetch user tenants to extract the userNum."""
         logger.info("Fetching user tenants...")
         url = f"{self.base_url}/minol.com~kundenportal~em~web/rest/EMData/getUserTenants"
-        headers = {
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Content-Type': 'application/json; charset=utf-8',
-            'Referer': f'{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true',
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-        logger.debug(f"Fetching user tenants from URL: {url}")
-        logger.debug(f"Request Headers: {json.dumps(headers, indent=2)}")
+        logger.debug("Fetching user tenants from URL: %s", url)
+        logger.debug("Request Headers: %s", self._json_headers)
         try:
-            logger.debug(f"Session cookies before getUserTenants: {self.session.cookies}")
-            response = self.session.get(url, headers=headers)
+            logger.debug("Session cookies before getUserTenants: %s", self.session.cookies)
+            response = self.session.get(url, headers=self._json_headers)
             response.raise_for_status()
 
             content_type = response.headers.get('Content-Type', '')
-            logger.debug(f"getUserTenants response URL: {response.url}")
-            logger.debug(f"getUserTenants response headers: {dict(response.headers)}")
+            logger.debug("getUserTenants response URL: %s", response.url)
+            logger.debug("getUserTenants response headers: %s", response.headers)
             if 'application/json' not in content_type:
                 raise ValueError(f"Expected JSON response, but got Content-Type: {content_type}")
 
-            self.user_tenants = response.json()
-            logger.debug(f"User tenants response: {json.dumps(self.user_tenants, indent=2)}")
+            self.user_tenants = _loads(response.content)
+            logger.debug("User tenants response: %s", self.user_tenants)
             if self.user_tenants and len(self.user_tenants) > 0:
                 self.user_num = self.user_tenants[0].get("userNumber")
                 logger.info(f"userNum found: {self.user_num}")
             else:
                 raise ValueError("User tenants not found or empty.")
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching user tenants: {e}")
+            # Callers report the failure: an expired session is routine for validate_session().
+            logger.debug("Error fetching user tenants: %s", e)
             raise
         except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Error processing user tenants response: {e}")
-            with open("user_tenants_error_response.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            logger.error("Response content saved to user_tenants_error_response.html")
+            logger.debug("Error processing user tenants response: %s", e)
+            logger.debug("User tenants response body: %s", response.text[:2000])
             raise
 
     def fetch_em_data(self, timeline_start, timeline_end, cons_type="HEIZUNG", dlg_key="100EH"):
@@ -250,40 +501,34 @@ class MinolConnector:
             "valuesInKWH": True,
             "dlgKey": dlg_key,
         }
-        headers = {
-            "Accept": "application/json, text/javascript, */*; q=0.01",
-            "Content-Type": "application/json; charset=UTF-8",
-            "Referer": f'{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true',
-            "X-Requested-With": "XMLHttpRequest",
-        }
 
-        logger.debug(f"Fetching EM data from URL: {url}")
-        logger.debug(f"Request Payload: {json.dumps(payload, indent=2)}")
-        logger.debug(f"Request Headers: {json.dumps(headers, indent=2)}")
+        logger.debug("Fetching EM data from URL: %s", url)
+        logger.debug("Request Payload: %s", payload)
+        logger.debug("Request Headers: %s", self._json_headers)
 
         try:
-            response = self.session.post(url, headers=headers, data=json.dumps(payload))
+            response = self.session.post(url, headers=self._json_headers, json=payload)
             response.raise_for_status()
-            logger.debug(f"EM data response status: {response.status_code}")
-            logger.debug(f"EM data response content: {response.text[:200]}...")
-            return response.json()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("EM data response status: %s", response.status_code)
+                logger.debug("EM data response content: %s...", response.text[:200])
+            return _loads(response.content)
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error fetching EM data: {e}")
             raise
         except json.JSONDecodeError as e:
             logger.error(f"Error decoding EM data response: {e}")
-            with open("em_data_error_response.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            logger.error("Response content saved to em_data_error_response.html")
+            logger.debug("EM data response body: %s", response.text[:2000])
             raise
 
-    def get_all_consumption_data(self, timeline_start, timeline_end):
+    def get_all_consumption_data(self, timeline_start, timeline_end, now: Optional[datetime] = None):
         """
         Fetch all consumption data types (heating, hot water, cold water) organized by room.
 
         Args:
             timeline_start (str): Start period in format YYYYMM (e.g., "202411")
             timeline_end (str): End period in format YYYYMM (e.g., "202510")
+            now (datetime): Timestamp to record for this fetch (default: current time)
 
         Returns:
             dict: Structured consumption data with the following format:
@@ -307,44 +552,31 @@ class MinolConnector:
                     "period": {"start": "YYYYMM", "end": "YYYYMM"}
                 }
         """
-        from datetime import datetime
-
         logger.info(f"Fetching all consumption data from {timeline_start} to {timeline_end}")
 
         consumption_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": (now or datetime.now()).isoformat(),
             "period": {
                 "start": timeline_start,
                 "end": timeline_end
             }
         }
 
-        try:
-            heating_raw = self.fetch_em_data(timeline_start, timeline_end, cons_type="HEIZUNG", dlg_key="100EH")
-            consumption_data["heating"] = self._process_consumption_data(
-                heating_raw, "HEIZUNG", timeline_start, timeline_end
-            )
-        except Exception as e:
-            logger.error(f"Error fetching heating data: {e}")
-            consumption_data["heating"] = {"error": str(e)}
-
-        try:
-            hot_water_raw = self.fetch_em_data(timeline_start, timeline_end, cons_type="WARMWASSER", dlg_key="100WW")
-            consumption_data["hot_water"] = self._process_consumption_data(
-                hot_water_raw, "WARMWASSER", timeline_start, timeline_end
-            )
-        except Exception as e:
-            logger.error(f"Error fetching hot water data: {e}")
-            consumption_data["hot_water"] = {"error": str(e)}
-
-        try:
-            cold_water_raw = self.fetch_em_data(timeline_start, timeline_end, cons_type="KALTWASSER", dlg_key="100KW")
-            consumption_data["cold_water"] = self._process_consumption_data(
-                cold_water_raw, "KALTWASSER", timeline_start, timeline_end
-            )
-        except Exception as e:
-            logger.error(f"Error fetching cold water data: {e}")
-            consumption_data["cold_water"] = {"error": str(e)}
+        # The three consumption types are independent requests to the same host; fetch them in parallel.
+        with ThreadPoolExecutor(max_workers=len(CONSUMPTION_TYPES)) as executor:
+            futures = {
+                executor.submit(self.fetch_em_data, timeline_start, timeline_end, cons_type, dlg_key): (key, cons_type)
+                for key, cons_type, dlg_key in CONSUMPTION_TYPES
+            }
+            for future in as_completed(futures):
+                key, cons_type = futures[future]
+                try:
+                    consumption_data[key] = self._process_consumption_data(
+                        future.result(), cons_type, timeline_start, timeline_end
+                    )
+                except Exception as e:
+                    logger.error(f"Error fetching {key.replace('_', ' ')} data: {e}")
+                    consumption_data[key] = {"error": str(e)}
 
         return consumption_data
 
@@ -363,41 +595,53 @@ class MinolConnector:
 
         Returns:
             dict: Processed data with by_room, overall timeline, and total_consumption
+                  (plus an internal _by_room_index lookup table)
         """
         processed = {
             "by_room": [],
             "timeline": [],
-            "total_consumption": 0.0
+            "total_consumption": 0.0,
+            # Internal room_name -> room lookup for get_room_consumption(); not part of the public format.
+            "_by_room_index": {},
         }
 
         if "table" in raw_data and raw_data["table"]:
+            add_room = processed["by_room"].append
+            index_room = processed["_by_room_index"].setdefault
+            total = 0.0
             for room_data in raw_data["table"]:
+                get = room_data.get
+                consumption = get("consumption", 0)
                 room_info = {
-                    "room_name": room_data.get("raum", "Unknown"),
-                    "room_key": room_data.get("raumKey"),
-                    "device_number": room_data.get("gerNr"),
-                    "consumption": room_data.get("consumption", 0),
-                    "unit": room_data.get("unit", "KWH"),
-                    "consumption_evaluated": room_data.get("consumptionBew", 0),
-                    "evaluation_score": room_data.get("bewertung"),
-                    "reading": room_data.get("ablesung", 0),
-                    "initial_reading": room_data.get("anfangsstand", 0),
+                    "room_name": get("raum", "Unknown"),
+                    "room_key": get("raumKey"),
+                    "device_number": get("gerNr"),
+                    "consumption": consumption,
+                    "unit": get("unit", "KWH"),
+                    "consumption_evaluated": get("consumptionBew", 0),
+                    "evaluation_score": get("bewertung"),
+                    "reading": get("ablesung", 0),
+                    "initial_reading": get("anfangsstand", 0),
                     # Note: Per-room timeline not available from API
                 }
-                processed["by_room"].append(room_info)
-                processed["total_consumption"] += room_data.get("consumption", 0)
+                add_room(room_info)
+                # Rooms with several devices share a name; keep the first, as the old linear scan did.
+                index_room(room_info["room_name"], room_info)
+                total += consumption
+            processed["total_consumption"] = total
 
         if "chart" in raw_data and raw_data["chart"]:
-            for entry in raw_data["chart"]:
-                if entry.get("keyFigure") != "REF":
-                    timeline_entry = {
-                        "period": entry.get("category"),
-                        "period_int": entry.get("categoryInt"),
-                        "value": entry.get("value", 0),
-                        "label": entry.get("label"),
-                        "num_values": entry.get("anzValues", 0)
-                    }
-                    processed["timeline"].append(timeline_entry)
+            processed["timeline"] = [
+                {
+                    "period": entry.get("category"),
+                    "period_int": entry.get("categoryInt"),
+                    "value": entry.get("value", 0),
+                    "label": entry.get("label"),
+                    "num_values": entry.get("anzValues", 0)
+                }
+                for entry in raw_data["chart"]
+                if entry.get("keyFigure") != "REF"
+            ]
 
         return processed
 
@@ -413,7 +657,16 @@ class MinolConnector:
         try:
             logger.info("Authenticating with Minol portal...")
             self.login()
-            self.get_user_tenants()
+            try:
+                self.get_user_tenants()
+            except Exception as e:
+                if not self._reused_state:
+                    raise
+                # The portal rejected the ticket from the saved state; don't keep reusing it.
+                logger.info("Session from saved browser state was rejected, logging in again: %s", e)
+                self._discard_storage_state()
+                self.login()
+                self.get_user_tenants()
             logger.info("Authentication successful")
             return True
         except Exception as e:
@@ -421,6 +674,90 @@ class MinolConnector:
             self._authenticated = False
             return False
 
+    def save_session(self, path: str):
+        """
+        Persist the session cookies to disk.
+
+        Args:
+            path: File to write; restore_session() reads it back after a restart
+        """
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(cookies, f)
+            os.chmod(path, 0o600)
+            logger.info("Saved %s session cookies to %s", len(cookies), path)
+        except OSError as e:
+            logger.warning("Could not save session to %s: %s", path, e)
+
+    def restore_session(self, path: str, max_age: Optional[timedelta] = None) -> bool:
+        """
+        Load session cookies written by save_session().
+
+        The cookies are not validated here; use validate_session() before relying on them.
+
+        Args:
+            path: File written by save_session()
+            max_age: Ignore the file if it was written longer ago than this
+                (default: the 8-hour SSO ticket lifetime)
+
+        Returns:
+            bool: True if cookies were restored
+        """
+        try:
+            age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(path))
+            if age > (max_age or self._ticket_lifetime):
+                logger.info("Saved session is too old (%s), ignoring it", age)
+                return False
+            with open(path, "r", encoding="utf-8") as f:
+                cookies = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning("Could not restore session from %s: %s", path, e)
+            return False
+
+        for cookie in cookies:
+            self.session.cookies.set(**cookie)
+        logger.info("Restored %s session cookies from %s", len(cookies), path)
+        return True
+
+    def validate_session(self) -> bool:
+        """
+        Check whether the current session cookies are still accepted by the portal.
+
+        Probes the portal with get_user_tenants(), which also refreshes user_num.
+
+        Returns:
+            bool: True if the session is usable without logging in again
+        """
+        if not self.session.cookies:
+            return False
+
+        try:
+            try:
+                self.get_user_tenants()
+            except requests.exceptions.ConnectionError as e:
+                logger.warning("Connection to portal failed, retrying with a new session: %s", e)
+                self.reset_session()
+                self.get_user_tenants()
+        except Exception as e:
+            logger.info("Session is no longer valid: %s", e)
+            self._authenticated = False
+            return False
+
+        self._authenticated = True
+        return True
+
     def get_consumption_data(
         self,
         months_back: int = 12,
@@ -429,6 +766,9 @@ class MinolConnector:
         """
         Fetch all consumption data (heating, hot water, cold water) with caching.
 
+        Concurrent calls that miss the cache share a single fetch; callers
+        joining an in-flight fetch get its result regardless of months_back.
+
         Args:
             months_back: Number of months of historical data to fetch (default: 12)
             force_update: Force data refresh even if cached data exists
@@ -436,28 +776,59 @@ class MinolConnector:
         Returns:
             Dict with consumption data or None on error
         """
-        if not force_update and self._last_data and self._last_update:
-            age = datetime.now() - self._last_update
-            if age < self._cache_duration:
-                logger.debug(f"Returning cached data (age: {age})")
-                return self._last_data
+        now = datetime.now()
+        if not force_update:
+            cached = self._fresh_cached_data(now)
+            if cached is not None:
+                return cached
+
+        # Single-flight: the first caller fetches, concurrent callers wait for its result.
+        with self._in_flight_lock:
+            if not force_update:
+                # The cache may have been refreshed while we waited for the lock.
+                cached = self._fresh_cached_data(now)
+                if cached is not None:
+                    return cached
+
+            future = self._in_flight
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight = Future()
+
+        if not is_leader:
+            logger.debug("Waiting for in-flight consumption data fetch")
+            return future.result()
 
+        try:
+            data = self._fetch_consumption_data(months_back, now)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                self._in_flight = None
+
+    def _fetch_consumption_data(self, months_back: int, now: datetime) -> Optional[Dict]:
+        """Authenticate if needed, fetch all consumption data and update the cache."""
         if not self._authenticated:
             if not self.authenticate():
                 return None
 
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30 * months_back)
+            end_date = now
+            # Step back whole calendar months; 30-day steps drift by a month per year.
+            start_month = end_date.year * 12 + end_date.month - 1 - months_back
 
-            timeline_start = start_date.strftime("%Y%m")
+            timeline_start = f"{start_month // 12:04d}{start_month % 12 + 1:02d}"
             timeline_end = end_date.strftime("%Y%m")
 
             logger.info(f"Fetching consumption data from {timeline_start} to {timeline_end}")
 
-            data = self.get_all_consumption_data(timeline_start, timeline_end)
+            data = self.get_all_consumption_data(timeline_start, timeline_end, now=now)
             self._last_data = data
-            self._last_update = datetime.now()
+            self._last_update = now
 
             return data
 
@@ -465,6 +836,15 @@ class MinolConnector:
             logger.error(f"Error fetching consumption data: {e}")
             return None
 
+    def _fresh_cached_data(self, now: datetime) -> Optional[Dict]:
+        """Return the cached consumption data if it is younger than the cache duration at `now`."""
+        if self._last_data and self._last_update:
+            age = now - self._last_update
+            if age < self._cache_duration:
+                logger.debug("Returning cached data (age: %s)", age)
+                return self._last_data
+        return None
+
     def get_heating_total(self) -> Optional[float]:
         """
         Get total heating consumption in kWh.
@@ -527,11 +907,11 @@ class MinolConnector:
         Returns:
             Consumption value or None if not found
         """
-        rooms = self.get_rooms_data(consumption_type)
-        if rooms:
-            for room in rooms:
-                if room["room_name"] == room_name:
-                    return room["consumption"]
+        data = self.get_consumption_data()
+        if data and consumption_type in data and "error" not in data[consumption_type]:
+            room = data[consumption_type].get("_by_room_index", {}).get(room_name)
+            if room:
+                return room["consumption"]
         return None
 
     def get_timeline(self, consumption_type: str = "heating") -> Optional[List[Dict]]:
@@ -585,19 +965,12 @@ class MinolConnector:
         logger.info("Fetching user details...")
         url = f"{self.base_url}/minol.com~util~framework~ui5~common~web/rest/UserInfo/getUserDetail"
 
-        headers = {
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Content-Type': 'application/json; charset=utf-8',
-            'Referer': f'{self.base_url}/minol.com~kundenportal~em~web/resources/monitoring/index.html?isMieter=true',
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-
         try:
-            response = self.session.get(url, headers=headers)
+            response = self.session.get(url, headers=self._json_headers)
             response.raise_for_status()
 
-            user_details = response.json()
-            logger.debug(f"User details response: {json.dumps(user_details, indent=2)}")
+            user_details = _loads(response.content)
+            logger.debug("User details response: %s", user_details)
             return user_details
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching user details: {e}")